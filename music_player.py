@@ -3,9 +3,13 @@
 
 import tkinter as tk
 from tkinter import filedialog, messagebox
+import bisect
+import functools
+import threading
 import time
 import re
 import os
+from array import array
 
 # don't import pygame.mixer at top-level to avoid interfering with Tk on some Windows setups
 try:
@@ -13,6 +17,80 @@ try:
 except Exception as e:
     pygame = None
 
+# optional: numba-compiled timestamp arithmetic for very large lyric files;
+# everything works without it via the pure-Python parse path
+try:
+    import numpy as np
+    import numba
+except Exception:
+    numba = None
+
+# compiled once at import; parse_lrc reuses it for every file load. One
+# alternation covers both [mm:ss.xx]lyric lines (groups 1-4) and metadata
+# tags like [ar:...]/[ti:...] (groups 5-6) in a single pass
+_LRC_RE = re.compile(r'\[(\d+):(\d+)(?:\.(\d+))?\](.*)|\[([a-z]+):([^\]\n]*)\]')
+
+def _parse(data, _re=_LRC_RE, _int=int):
+    # default args bind the pattern and int to locals, which CPython looks up
+    # faster than globals/builtins in this per-match hot loop
+    entries = []
+    meta = {}
+    for m in _re.finditer(data):
+        if m[1] is not None:
+            entries.append((_int(m[1])*60 + _int(m[2]) + _int(m[3] or 0)/1000.0,
+                            m[4].strip()))
+        else:
+            meta[m[5]] = m[6].strip()
+    return entries, meta
+
+if numba is not None:
+    @numba.njit(cache=True, fastmath=True)
+    def _compute_times(mm, ss, ms):
+        out = np.empty(mm.shape[0], np.float64)
+        for i in range(mm.shape[0]):
+            out[i] = mm[i]*60.0 + ss[i] + ms[i]*0.001
+        return out
+
+# only worth paying the JIT/array-building overhead past this many entries
+_NUMBA_MIN_ENTRIES = 1000
+
+def _parse_numba(data):
+    """Numba-accelerated variant of _parse for massive LRC files.
+    Returns None when numba is unavailable or the file is too small."""
+    if numba is None or data.count('\n') <= _NUMBA_MIN_ENTRIES:
+        return None
+    matches = _LRC_RE.findall(data)
+    fields = [x for x in matches if x[0]]
+    if len(fields) <= _NUMBA_MIN_ENTRIES:
+        return None
+    meta = {x[4]: x[5].strip() for x in matches if not x[0]}
+    n = len(fields)
+    mm = np.fromiter((int(x[0]) for x in fields), np.int64, n)
+    ss = np.fromiter((int(x[1]) for x in fields), np.int64, n)
+    ms = np.fromiter((int(x[2] or 0) for x in fields), np.int64, n)
+    times = _compute_times(mm, ss, ms)
+    return [(times[i], fields[i][3].strip()) for i in range(n)], meta
+
+@functools.lru_cache(maxsize=128)
+def _parse_lrc_cached(path, mtime_ns, size):
+    # mtime/size key the cache so an edited file reparses; the returned pair
+    # is shared between hits and must be treated as read-only
+    with open(path, encoding='utf-8', errors='ignore') as f:
+        data = f.read()
+    # one regex pass over the whole file keeps the work inside the regex
+    # engine instead of a Python-level per-line loop; very large files take
+    # the numba kernel when it's available
+    parsed = _parse_numba(data)
+    if parsed is None:
+        parsed = _parse(data)
+    entries, meta = parsed
+    entries.sort(key=lambda x: x[0])
+    # split into parallel arrays so the sync thread can bisect the timestamps;
+    # array('d') keeps them contiguous and unboxed
+    times = array('d', (e[0] for e in entries))
+    texts = tuple(e[1] for e in entries)
+    return times, texts, tuple(sorted(meta.items()))
+
 class MusicPlayer:
     def __init__(self, root):
         self.root = root
@@ -21,8 +99,17 @@ class MusicPlayer:
         self.playing = False
         self.paused = False
         self.audio_path = None
-        self.lrc = []
-        self.start_time = 0.0
+        # lyrics stored as parallel arrays so lookup is a single bisect call;
+        # timestamps are packed doubles, 8 B each instead of boxed floats
+        self._lrc_times = array('d')
+        self._lrc_texts = []
+        # [ar:...]/[ti:...] style tags from the loaded .lrc file
+        self.meta = {}
+        self._last_idx = -1
+        self._last_lyric_text = None
+        self._stop_event = None
+        # reference point on the monotonic clock; never store time.time() here
+        self.start_time: float = 0.0
         self.pause_offset = 0.0
         self.pygame_initialized = False
 
@@ -42,8 +129,6 @@ class MusicPlayer:
         self.label_lyric = tk.Label(root, textvariable=self.lyric_var, wraplength=460, font=("Helvetica", 12), justify="center")
         self.label_lyric.pack(pady=12, fill="x")
 
-        # ensure pygame mixer is initialized lazily
-        self.update_loop()
 
     def ensure_pygame(self):
         """Initialize pygame and mixer when needed."""
@@ -80,34 +165,28 @@ class MusicPlayer:
         base, _ = os.path.splitext(file)
         lrc_path = base + ".lrc"
         if os.path.exists(lrc_path):
-            self.lrc = self.parse_lrc(lrc_path)
+            self._lrc_times, self._lrc_texts = self.parse_lrc(lrc_path)
             messagebox.showinfo("Lyrics", f"Loaded lyrics from {os.path.basename(lrc_path)}")
         else:
             if messagebox.askyesno("Lyrics", "No .lrc found next to the audio. Load lyrics (.lrc) now?"):
                 lrc_file = filedialog.askopenfilename(title="Choose .lrc file", filetypes=[("Lyrics",".lrc"),("All","*.*")])
                 if lrc_file:
-                    self.lrc = self.parse_lrc(lrc_file)
+                    self._lrc_times, self._lrc_texts = self.parse_lrc(lrc_file)
 
+        self._last_idx = -1
+        self._last_lyric_text = None
         self.playing = False
         self.paused = False
         self.btn_play.config(text="Play")
         self.pause_offset = 0.0
 
     def parse_lrc(self, path):
-        pattern = re.compile(r'\[(\d+):(\d+)(?:\.(\d+))?\](.*)')
-        entries = []
-        with open(path, encoding='utf-8', errors='ignore') as f:
-            for line in f:
-                line = line.strip()
-                for match in pattern.finditer(line):
-                    mm = int(match.group(1))
-                    ss = int(match.group(2))
-                    ms = int(match.group(3) or 0)
-                    text = match.group(4).strip()
-                    t = mm*60 + ss + ms/1000.0
-                    entries.append((t, text))
-        entries.sort(key=lambda x: x[0])
-        return entries
+        # memoized on (path, mtime, size): reloading the same unchanged file
+        # (e.g. skipping back in a playlist) is served from the cache
+        st = os.stat(path)
+        times, texts, meta = _parse_lrc_cached(path, st.st_mtime_ns, st.st_size)
+        self.meta = dict(meta)
+        return times, texts
 
     def play_pause(self):
         if not self.audio_path:
@@ -119,55 +198,82 @@ class MusicPlayer:
             except Exception as e:
                 messagebox.showerror("Play error", f"Couldn't play audio:\n{e}")
                 return
-            self.start_time = time.time() - (self.pause_offset/1000.0)
+            self.start_time = time.monotonic() - (self.pause_offset/1000.0)
             self.playing = True
             self.paused = False
             self.btn_play.config(text="Pause")
+            self._start_sync()
         else:
             if not self.paused:
                 pygame.mixer.music.pause()
                 self.paused = True
                 self.pause_offset = pygame.mixer.music.get_pos()
                 self.btn_play.config(text="Resume")
+                self._stop_sync()
             else:
                 pygame.mixer.music.unpause()
-                self.start_time = time.time() - (self.pause_offset/1000.0)
+                self.start_time = time.monotonic() - (self.pause_offset/1000.0)
                 self.paused = False
                 self.btn_play.config(text="Pause")
+                self._start_sync()
 
     def stop(self):
         if self.pygame_initialized:
             pygame.mixer.music.stop()
+        self._stop_sync()
         self.playing = False
         self.paused = False
         self.pause_offset = 0.0
+        self._last_idx = -1
+        self._last_lyric_text = None
         self.btn_play.config(text="Play")
         self.lyric_var.set("Playback stopped.")
 
     def get_play_time(self):
         if not self.pygame_initialized:
             return 0.0
+        # while paused the position is frozen; answer from the cached offset
+        # without crossing into SDL at all
+        if self.paused:
+            return self.pause_offset / 1000.0
         pos = pygame.mixer.music.get_pos()
         if pos >= 0:
             return pos / 1000.0
-        if self.playing and not self.paused:
-            return time.time() - self.start_time
-        if self.paused:
-            return self.pause_offset / 1000.0
+        if self.playing:
+            return time.monotonic() - self.start_time
         return 0.0
 
-    def update_loop(self):
-        if self.playing or self.paused:
+    def _start_sync(self):
+        """Spawn the lyric sync thread; called whenever playback (re)starts."""
+        self._stop_sync()
+        self._stop_event = threading.Event()
+        threading.Thread(target=self._sync_thread, args=(self._stop_event,),
+                         daemon=True).start()
+
+    def _stop_sync(self):
+        if self._stop_event is not None:
+            self._stop_event.set()
+            self._stop_event = None
+
+    def _sync_thread(self, stop_event):
+        # runs outside the Tk main loop so timing isn't quantized by Tk's
+        # scheduler; the only Tk interaction is marshalled via after_idle
+        while not stop_event.is_set() and self.playing and not self.paused:
             t = self.get_play_time()
-            text = ""
-            for time_s, lyric in self.lrc:
-                if time_s <= t + 0.1:
-                    text = lyric
-                else:
-                    break
-            if text:
-                self.lyric_var.set(text)
-        self.root.after(200, self.update_loop)
+            i = bisect.bisect_right(self._lrc_times, t + 0.1) - 1
+            if i >= 0 and i != self._last_idx:
+                self._last_idx = i
+                text = self._lrc_texts[i]
+                # repeated lines (choruses) would redraw the same text; skip those too
+                if text and text != self._last_lyric_text:
+                    self._last_lyric_text = text
+                    self.root.after_idle(self.lyric_var.set, text)
+            # sleep until the next lyric is due rather than on a fixed tick
+            if i + 1 < len(self._lrc_times):
+                delta = self._lrc_times[i + 1] - t
+            else:
+                delta = 1.0
+            stop_event.wait(min(max(delta, 0.02), 1.0))
 
 
 if __name__ == "__main__":
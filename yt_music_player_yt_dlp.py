@@ -1,24 +1,90 @@
+import bisect
+import concurrent.futures
+import functools
 import time
 import threading
+import shelve
 import sys
 import math
+import os
+import re
+import urllib.request
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
 import vlc
 from yt_dlp import YoutubeDL
 
 # ---------- Utility functions ----------
 
+# matches watch?v=, youtu.be/, shorts/, embed/ URLs or a bare 11-char video id
+_VIDEO_ID_RE = re.compile(
+    r"(?:v=|youtu\.be/|shorts/|embed/)([0-9A-Za-z_-]{11})|^([0-9A-Za-z_-]{11})$")
+
+def extract_video_id(url_or_id: str):
+    """Pull the 11-character video id out of a YouTube URL (or bare id).
+    Returns None if it can't be determined locally."""
+    m = _VIDEO_ID_RE.search(url_or_id)
+    if m:
+        return m.group(1) or m.group(2)
+    return None
+
+# yt-dlp's own cachedir (player JS signatures) plus our url shelve live here
+_CACHE_DIR = os.path.expanduser("~/.cache/yt_music_player")
+# keys main() reads from the info dict; only these are persisted in the cache
+_INFO_KEYS = ("id", "title", "uploader", "channel", "duration")
+
+def _url_still_live(url: str) -> bool:
+    """Cheap HEAD request to check a cached stream URL hasn't expired."""
+    try:
+        req = urllib.request.Request(url, method="HEAD")
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status == 200
+    except Exception:
+        return False
+
+def _cache_get(video_id: str):
+    try:
+        with shelve.open(os.path.join(_CACHE_DIR, "urls")) as db:
+            entry = db.get(video_id)
+    except Exception:
+        return None
+    if not entry:
+        return None
+    info_subset, audio_url, expiry = entry
+    if time.time() >= expiry or not _url_still_live(audio_url):
+        return None
+    return info_subset, audio_url
+
+def _cache_put(video_id: str, info: dict, audio_url: str):
+    subset = {k: info.get(k) for k in _INFO_KEYS}
+    try:
+        with shelve.open(os.path.join(_CACHE_DIR, "urls")) as db:
+            # stream URLs typically carry ~6 h tokens; be conservative
+            db[video_id] = (subset, audio_url, time.time() + 3600)
+    except Exception:
+        pass
+
 def fetch_info_and_audio_url(youtube_url_or_id: str):
     """
     Uses yt_dlp to extract video metadata and the best audio format's direct URL
     without downloading the file.
     Returns tuple: (info_dict, audio_url) or raises Exception
+    Repeat plays of a recently fetched video are answered from a disk cache,
+    skipping the expensive extractor run.
     """
+    os.makedirs(_CACHE_DIR, exist_ok=True)
+    video_id = extract_video_id(youtube_url_or_id)
+    if video_id:
+        cached = _cache_get(video_id)
+        if cached:
+            return cached
+
     ydl_opts = {
         "format": "bestaudio/best",
         "quiet": True,
         "skip_download": True,
         "no_warnings": True,
+        # persist signature/player-JS work between runs
+        "cachedir": _CACHE_DIR,
         # do not merge into m4a etc; we want the direct stream URL from a format entry
     }
     with YoutubeDL(ydl_opts) as ydl:
@@ -31,38 +97,35 @@ def fetch_info_and_audio_url(youtube_url_or_id: str):
                     info = e
                     break
 
-        # Prefer formats with acodec != 'none'
+        # Prefer formats with acodec != 'none'; rank by abr then filesize
         formats = info.get("formats") or []
-        best_audio_url = None
-        best_bitrate = -1
-        for f in formats:
-            acodec = f.get("acodec")
-            if not acodec or acodec == "none":
-                continue
-            # prefer higher abr or filesize
-            abr = f.get("abr") or 0
-            filesize = f.get("filesize") or 0
-            score = (abr or 0) * 1000 + (filesize or 0)
-            if score > best_bitrate:
-                best_bitrate = score
-                best_audio_url = f.get("url")
+        audio_formats = [f for f in formats if (f.get("acodec") or "none") != "none"]
+        best = max(audio_formats,
+                   key=lambda f: ((f.get("abr") or 0), (f.get("filesize") or 0)),
+                   default=None)
+        best_audio_url = best.get("url") if best else None
         # Fallback: some entries expose 'url' directly
         if not best_audio_url:
             # try top-level url
             best_audio_url = info.get("url")
         if not best_audio_url:
             raise RuntimeError("Could not find a direct audio URL in the video formats.")
+        if video_id or info.get("id"):
+            _cache_put(video_id or info["id"], info, best_audio_url)
         return info, best_audio_url
 
-def fetch_transcript(video_id: str, languages=None):
+@functools.lru_cache(maxsize=32)
+def fetch_transcript(video_id: str, languages: tuple = ()):
     """
     Try to fetch transcript entries via youtube_transcript_api.
     Returns a list of dicts: {'text': ..., 'start': <sec>, 'duration': <sec>}
     If not available returns None.
+    Memoized per (video_id, languages) so replaying the same video in one
+    session skips the HTTPS round-trip; languages must be a tuple (hashable).
     """
     try:
         if languages:
-            transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=languages)
+            transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=list(languages))
         else:
             transcript = YouTubeTranscriptApi.get_transcript(video_id)
         return transcript
@@ -89,52 +152,83 @@ class LyricsDisplayer(threading.Thread):
         super().__init__(daemon=True)
         self.player = player
         self.transcript = transcript or []
-        self.entries = []
-        for item in self.transcript:
-            start_ms = int(item.get("start", 0) * 1000)
-            text = item.get("text", "").strip()
-            self.entries.append((start_ms, text))
+        # parallel arrays sorted by start time; the active entry is found by
+        # bisecting the timestamps, which stays correct across seeks
+        entries = sorted(
+            (int(item.get("start", 0) * 1000), item.get("text", "").strip())
+            for item in self.transcript)
+        self._starts = [e[0] for e in entries]
+        self._texts = [e[1] for e in entries]
         self.stop_flag = False
+        # libvlc pushes TimeChanged events (~every 250 ms) from its own
+        # thread; cache the reported time and wake the display loop on it
+        # instead of polling player.get_time() across the ctypes boundary
+        self._cur_ms = -1
+        self._tick = threading.Event()
+        self._em = player.event_manager()
+        self._em.event_attach(vlc.EventType.MediaPlayerTimeChanged, self._on_time_changed)
+
+    def _on_time_changed(self, event):
+        self._cur_ms = int(event.u.new_time)
+        self._tick.set()
 
     def stop(self):
         self.stop_flag = True
+        try:
+            self._em.event_detach(vlc.EventType.MediaPlayerTimeChanged)
+        except Exception:
+            pass
+        self._tick.set()  # wake the loop so it notices stop_flag
 
     def run(self):
-        if not self.entries:
+        if not self._starts:
             # No transcript: show simple playback timer
             print("\n[No transcript available] Showing playback time. Type 's' + Enter to stop.\n")
             prev_time = -1
             try:
                 while not self.stop_flag and self.player.is_playing():
-                    t = self.player.get_time()  # ms
-                    if t != prev_time:
+                    self._tick.wait(timeout=0.5)
+                    self._tick.clear()
+                    t = self._cur_ms
+                    # the timer only shows whole seconds, so redraw once per second
+                    if t >= 0 and t // 1000 != prev_time // 1000:
                         prev_time = t
                         sys.stdout.write(f"\rPlaying — {format_time_ms(t)}")
                         sys.stdout.flush()
-                    time.sleep(0.2)
             except KeyboardInterrupt:
                 pass
             print()
             return
 
-        idx = 0
-        total = len(self.entries)
+        last_idx = -1
+        total = len(self._starts)
         print("\nLyrics (synced). Type 's' + Enter to stop playback.\n")
         try:
-            while not self.stop_flag and idx < total:
-                current_ms = self.player.get_time()
+            while not self.stop_flag and last_idx < total - 1:
+                current_ms = self._cur_ms
                 if current_ms < 0:
-                    time.sleep(0.1)
+                    self._tick.wait(timeout=0.1)
+                    self._tick.clear()
                     continue
-                start_ms, text = self.entries[idx]
-                # if playback passed start_ms, print it
-                if current_ms + 250 >= start_ms:
-                    timestamp = format_time_ms(start_ms)
-                    sys.stdout.write(f"{timestamp} — {text}\n")
+                # bisect finds the entry for the current position, so the
+                # display stays in sync even after the user seeks
+                i = bisect.bisect_right(self._starts, current_ms + 250) - 1
+                if i != last_idx and i >= 0:
+                    # after a forward jump print every overdue entry in one
+                    # batch; a backward seek just reprints the current line
+                    first = last_idx + 1 if i > last_idx else i
+                    for j in range(first, i + 1):
+                        timestamp = format_time_ms(self._starts[j])
+                        sys.stdout.write(f"{timestamp} — {self._texts[j]}\n")
                     sys.stdout.flush()
-                    idx += 1
-                else:
-                    time.sleep(0.05)
+                last_idx = i
+                if i + 1 >= total:
+                    break
+                # wait for the next libvlc time event, bounded by how far
+                # away the next entry is so stop stays responsive
+                delta = (self._starts[i + 1] - current_ms) / 1000.0
+                self._tick.clear()
+                self._tick.wait(timeout=min(max(delta - 0.1, 0.05), 1.0))
             # After finishing transcript, wait until playback ends (or stop)
             while not self.stop_flag and self.player.is_playing():
                 time.sleep(0.2)
@@ -151,9 +245,16 @@ def main():
         print("No URL provided. Exiting.")
         return
 
+    # Info extraction and transcript fetch are independent network calls;
+    # overlap them when we can derive the video id locally from the URL.
+    local_id = extract_video_id(url)
     print("\nFetching video info via yt-dlp...")
     try:
-        info, audio_url = fetch_info_and_audio_url(url)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as ex:
+            fut_info = ex.submit(fetch_info_and_audio_url, url)
+            fut_tx_en = ex.submit(fetch_transcript, local_id, ("en",)) if local_id else None
+            info, audio_url = fut_info.result()
+            transcript_en = fut_tx_en.result() if fut_tx_en else None
     except Exception as e:
         print(f"Failed to extract info/audio URL: {e}")
         print("If this persists, try updating yt-dlp: pip install -U yt-dlp")
@@ -162,7 +263,7 @@ def main():
     title = info.get("title", "<unknown>")
     uploader = info.get("uploader") or info.get("channel") or "<unknown>"
     duration = info.get("duration") or 0
-    video_id = info.get("id")
+    video_id = info.get("id") or local_id
     print(f"\nTitle  : {title}")
     print(f"Uploader: {uploader}")
     mins = duration // 60
@@ -172,12 +273,15 @@ def main():
         print(f"Video id: {video_id}")
 
     # Try to fetch transcript (prefer english then defaults)
-    transcript = None
     print("\nTrying to fetch transcript (captions) for lyrics...")
-    for lang_try in (["en"], None):
-        transcript = fetch_transcript(video_id, languages=lang_try)
-        if transcript:
-            break
+    transcript = transcript_en
+    if not transcript:
+        # english was already tried concurrently when the id was known locally
+        remaining = ((),) if local_id else (("en",), ())
+        for lang_try in remaining:
+            transcript = fetch_transcript(video_id, languages=lang_try)
+            if transcript:
+                break
 
     if transcript:
         print("Transcript fetched — will attempt to sync lyrics.")